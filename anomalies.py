@@ -0,0 +1,142 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+# --------------------------
+# Anomaly and Spike Detection
+# --------------------------
+ORDER_WINDOW = 20       # previous order lines per school / item type
+ORDER_MIN_PERIODS = 5
+MONTH_WINDOW = 6        # previous months per item type
+MONTH_MIN_PERIODS = 3
+THRESHOLD = 3.5         # robust z-score above which a value is flagged
+IQR_TO_SIGMA = 1.349
+# Lower bounds on the robust scale, so flat histories (e.g. quantity 1 on almost
+# every line) do not turn a 2-unit order into an outlier. With a floor of 100% of
+# the median an order line must exceed 4.5x its usual size to be flagged.
+ORDER_FLOOR_FRACTION = 1.0    # of the rolling median, per order line
+MONTH_FLOOR_FRACTION = 0.25   # of the rolling median, per month
+SCALE_FLOOR_UNITS = 1.0       # one whole unit / pound
+
+ORDER_COLUMNS = ['Order ID', 'Order Date', 'School Match', 'Item Type', 'Quantity', 'Item Total']
+
+
+def _robust_scale(median, q1, q3, floor_fraction):
+    # max(IQR / 1.349, floor_fraction x median, 1 unit): never zero, and never so
+    # small that a one-unit step on a flat history looks extreme
+    scale = (q3 - q1) / IQR_TO_SIGMA
+    floor = (median.abs() * floor_fraction).clip(lower=SCALE_FLOOR_UNITS)
+    return np.maximum(scale, floor).where(median.notna())
+
+
+def robust_scores(values, groups):
+    """Robust z-score of each value against the previous ORDER_WINDOW values of its group.
+
+    Uses rolling median and interquartile range, so a few extreme orders do not
+    inflate the baseline they are measured against. Values must be in time order.
+    """
+    prior = values.groupby(groups, sort=False).shift(1)
+    rolling = prior.groupby(groups, sort=False).rolling(ORDER_WINDOW, min_periods=ORDER_MIN_PERIODS)
+    median = rolling.median().reset_index(level=0, drop=True)
+    q1 = rolling.quantile(0.25).reset_index(level=0, drop=True)
+    q3 = rolling.quantile(0.75).reset_index(level=0, drop=True)
+    return ((values - median) / _robust_scale(median, q1, q3, ORDER_FLOOR_FRACTION)).reindex(values.index)
+
+
+def monthly_spikes(monthly):
+    """Flag months whose revenue is far above the previous MONTH_WINDOW months.
+
+    `monthly` is a (month x series) table; every column is scored at once.
+    Returns a long DataFrame of spikes with Month, Series, Revenue and Score.
+    """
+    if monthly.empty:
+        return pd.DataFrame(columns=['Month', 'Series', 'Revenue', 'Score'])
+    prior = monthly.shift(1).rolling(MONTH_WINDOW, min_periods=MONTH_MIN_PERIODS)
+    median = prior.median()
+    scale = _robust_scale(median, prior.quantile(0.25), prior.quantile(0.75), MONTH_FLOOR_FRACTION)
+    scores = (monthly - median) / scale
+    stacked = pd.DataFrame({'Revenue': monthly.stack(), 'Score': scores.stack()})
+    spikes = stacked[stacked['Score'] > THRESHOLD].reset_index()
+    spikes.columns = ['Month', 'Series', 'Revenue', 'Score']
+    return spikes[['Month', 'Series', 'Revenue', 'Score']].sort_values('Month', ignore_index=True)
+
+
+# --------------------------
+# Incremental State
+# --------------------------
+def _append(frame, rows):
+    return rows if frame.empty else pd.concat([frame, rows], ignore_index=True)
+
+
+def new_anomaly_state():
+    """Detection state carried between data loads (see update_anomalies)."""
+    return {
+        'lock': threading.Lock(),
+        'seen': pd.Index([], dtype='uint64'),
+        'monthly': pd.DataFrame(),
+        'outliers': pd.DataFrame(columns=ORDER_COLUMNS + ['School Score', 'Item Score', '_hash']),
+        'spikes': monthly_spikes(pd.DataFrame()),
+    }
+
+
+def monthly_revenue(edu_df):
+    """Monthly revenue per item type plus an 'All Education' total, with gap months as 0."""
+    dated = edu_df.dropna(subset=['Order Date'])
+    if dated.empty:
+        return pd.DataFrame()
+    month = dated['Order Date'].dt.to_period('M').dt.to_timestamp()
+    monthly = dated.groupby([month, dated['Item Type']])['Item Total'].sum().unstack(fill_value=0.0)
+    monthly['All Education'] = dated.groupby(month)['Item Total'].sum()
+    months = pd.date_range(monthly.index.min(), monthly.index.max(), freq='MS')
+    return monthly.reindex(months).fillna(0.0)
+
+
+def score_new_rows(values, groups, new):
+    """Robust scores for the rows flagged in `new`, without rescanning history.
+
+    Only groups containing new rows are scored, and only from ORDER_WINDOW lines
+    before each group's first new row onwards. Inputs must be in time order.
+    """
+    affected = groups.isin(groups[new].dropna().unique())
+    values, groups, new = values[affected], groups[affected], new[affected]
+    position = groups.groupby(groups, sort=False).cumcount()
+    first_new = position[new].groupby(groups[new], sort=False).min()
+    window = position >= groups.map(first_new) - ORDER_WINDOW
+    scores = robust_scores(values[window], groups[window])
+    return scores[new[window]]
+
+
+def update_anomalies(state, edu_df):
+    """Bring the state in line with edu_df, scoring only order lines not seen before.
+
+    New order lines are scored against the ORDER_WINDOW previous lines of their
+    school and item type; groups without new lines are not touched. Lines that
+    were edited or deleted upstream no longer match a current row hash and are
+    dropped from the outliers. Monthly totals are rebuilt from edu_df (a single
+    groupby) so corrections never leave stale sums behind.
+    """
+    rows = edu_df[ORDER_COLUMNS].sort_values('Order Date', kind='mergesort')
+    hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    with state['lock']:
+        # Hash-table lookups; np.isin would sort both arrays on every load
+        new = ~pd.Series(hashes, index=rows.index).isin(state['seen'])
+        state['seen'] = pd.Index(hashes)
+
+        # Forget lines that are gone from the current load
+        outliers = state['outliers'][state['outliers']['_hash'].astype('uint64').isin(state['seen'])]
+
+        if new.any():
+            scored = rows[new].assign(_hash=hashes[new.to_numpy()])
+            scored['School Score'] = score_new_rows(
+                pd.to_numeric(rows['Item Total'], errors='coerce'), rows['School Match'], new)
+            scored['Item Score'] = score_new_rows(
+                pd.to_numeric(rows['Quantity'], errors='coerce'), rows['Item Type'], new)
+            flagged = scored[(scored['School Score'] > THRESHOLD) | (scored['Item Score'] > THRESHOLD)]
+            outliers = _append(outliers, flagged.reset_index(drop=True))
+
+        state['outliers'] = outliers
+        state['monthly'] = monthly_revenue(rows)
+        state['spikes'] = monthly_spikes(state['monthly'])
+    return state
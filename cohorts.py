@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+
+# --------------------------
+# Cohort Retention
+# --------------------------
+def cohort_matrices(edu_df):
+    """Schools grouped by first-order month, with activity in each later month.
+
+    Schools and months are integer-coded and every matrix is filled with a single
+    np.bincount over flat (cohort, months since first order) cells, so no Python
+    loop or pivot_table runs over individual orders. Returns a dict with:
+
+    - 'size': schools in each cohort
+    - 'schools': schools ordering in month k, as % of the cohort (repeat purchase)
+    - 'revenue': revenue in month k, as % of the cohort's first-month revenue
+
+    Cells later than the last month in the data are NaN.
+    """
+    dated = edu_df.dropna(subset=['Order Date', 'School Match'])
+    if dated.empty:
+        empty = pd.DataFrame()
+        return {'size': pd.Series(dtype=int), 'schools': empty, 'revenue': empty}
+
+    school_codes, _ = pd.factorize(dated['School Match'])
+    order_dates = dated['Order Date']
+    month_codes = (order_dates.dt.year * 12 + order_dates.dt.month).to_numpy()
+    first_code = month_codes.min()
+    month_codes = month_codes - first_code
+    n_months = month_codes.max() + 1
+    n_schools = school_codes.max() + 1
+
+    first_month = np.full(n_schools, n_months, dtype=month_codes.dtype)
+    np.minimum.at(first_month, school_codes, month_codes)
+    cohort = first_month[school_codes]
+    cell = cohort * n_months + (month_codes - cohort)
+    n_cells = n_months * n_months
+
+    # Each school counts once per active month
+    active = np.unique(school_codes.astype(np.int64) * n_months + month_codes)
+    active_school = active // n_months
+    active_cohort = first_month[active_school]
+    active_cell = active_cohort * n_months + (active % n_months - active_cohort)
+    schools = np.bincount(active_cell, minlength=n_cells).reshape(n_months, n_months).astype(float)
+
+    item_total = pd.to_numeric(dated['Item Total'], errors='coerce').fillna(0).to_numpy()
+    revenue = np.bincount(cell, weights=item_total, minlength=n_cells).reshape(n_months, n_months)
+
+    size = schools[:, 0]
+    keep = size > 0
+    ages = np.arange(n_months)
+    beyond_data = ages[None, :] > (n_months - 1 - np.arange(n_months))[:, None]
+    schools[beyond_data] = np.nan
+    revenue[beyond_data] = np.nan
+
+    start = pd.Period(year=(first_code - 1) // 12, month=(first_code - 1) % 12 + 1, freq='M')
+    cohorts = pd.period_range(start, periods=n_months, freq='M').to_timestamp()[keep]
+    index = pd.Index(cohorts, name='First Order Month')
+    columns = pd.Index(ages, name='Months Since First Order')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        school_pct = schools[keep] / size[keep, None] * 100
+        revenue_pct = revenue[keep] / revenue[keep, :1] * 100
+    return {
+        'size': pd.Series(size[keep].astype(int), index=index, name='Schools'),
+        'schools': pd.DataFrame(school_pct, index=index, columns=columns),
+        'revenue': pd.DataFrame(revenue_pct, index=index, columns=columns).replace([np.inf, -np.inf], np.nan),
+    }
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+
+# --------------------------
+# Schools Reference Join
+# --------------------------
+# Header variants seen in Schools sheet exports, matched case-insensitively
+SCHOOL_NAME_COLUMNS = ['School Match', 'School Name', 'School', 'EstablishmentName', 'Establishment Name', 'Name']
+REFERENCE_COLUMNS = {
+    'Region': ['Region', 'GOR (name)', 'Government Office Region'],
+    'School Type': ['School Type', 'Type', 'TypeOfEstablishment (name)', 'Type of Establishment'],
+    'Number of Pupils': ['Number of Pupils', 'NumberOfPupils', 'Pupils', 'Pupil Count'],
+    'Local Authority': ['Local Authority', 'LA (name)', 'LA'],
+    'Postcode': ['Postcode'],
+}
+
+
+def _find_column(df, candidates):
+    columns = {str(col).strip().lower(): col for col in df.columns}
+    return next((columns[c.lower()] for c in candidates if c.lower() in columns), None)
+
+
+def match_key(names):
+    """Normalised school name used as the join key on both sides."""
+    return names.astype(str).str.strip().str.casefold().str.replace(r"\s+", " ", regex=True)
+
+
+def build_school_index(schools_df):
+    """Hash index over the Schools sheet.
+
+    Returns (index, reference): a unique pd.Index of match keys and a reference
+    table whose rows line up with it, holding the REFERENCE_COLUMNS found in the
+    sheet under their canonical names. Returns (None, None) if no name column exists.
+    """
+    name_col = _find_column(schools_df, SCHOOL_NAME_COLUMNS)
+    if name_col is None:
+        return None, None
+    schools_df = schools_df[schools_df[name_col].notna()]
+    reference = pd.DataFrame({'_key': match_key(schools_df[name_col])})
+    for target, candidates in REFERENCE_COLUMNS.items():
+        col = _find_column(schools_df, candidates)
+        if col is not None:
+            reference[target] = schools_df[col].to_numpy()
+    if 'Region' in reference:
+        reference['Region'] = normalise_region(reference['Region'])
+    reference = reference.drop_duplicates('_key').reset_index(drop=True)
+    return pd.Index(reference.pop('_key')), reference
+
+
+def enrich_sales(sales_df, schools_df, school_index=None):
+    """Fill region, school type, pupil counts, etc. on sales rows from the Schools sheet.
+
+    Rows are looked up through the hash index on their School Match key; matched
+    rows take the reference values, unmatched rows keep whatever the export had.
+    """
+    index, reference = school_index if school_index is not None else build_school_index(schools_df)
+    if index is None or len(index) == 0 or 'School Match' not in sales_df:
+        return sales_df
+    positions = index.get_indexer(match_key(sales_df['School Match']))
+    matched = positions >= 0
+    enriched = sales_df.copy()
+    for col in reference.columns:
+        values = pd.Series(reference[col].to_numpy()[positions.clip(min=0)], index=sales_df.index)
+        values = values.where(matched)
+        enriched[col] = values.where(values.notna(), enriched[col]) if col in enriched else values
+    return enriched
+
+
+def normalise_region(region):
+    """Trimmed, title-cased region names; missing values stay missing."""
+    return region.astype(str).str.strip().str.title().where(region.notna())
+
+
+def schools_per_region(schools_df, school_index=None):
+    """Distinct schools per region, counted the same way as market_penetration."""
+    index, reference = school_index if school_index is not None else build_school_index(schools_df)
+    if index is None:
+        # No school name column to deduplicate on; count sheet rows instead
+        return normalise_region(schools_df['Region']).value_counts() if 'Region' in schools_df else pd.Series(dtype=int)
+    if 'Region' not in reference:
+        return pd.Series(dtype=int)
+    return reference['Region'].value_counts()
+
+
+def market_penetration(edu_df, schools_df, school_index=None):
+    """Schools reached vs. total schools per region, from the Schools sheet."""
+    index, reference = school_index if school_index is not None else build_school_index(schools_df)
+    columns = ['Total Schools', 'Schools Reached', 'Penetration %']
+    if index is None or len(index) == 0 or 'Region' not in reference:
+        return pd.DataFrame(columns=columns)
+    regions = reference['Region']
+    positions = index.get_indexer(match_key(pd.Series(edu_df['School Match'].unique())))
+    reached = regions.iloc[np.unique(positions[positions >= 0])]
+    penetration = pd.DataFrame({
+        'Total Schools': schools_per_region(schools_df, (index, reference)),
+        'Schools Reached': reached.value_counts(),
+    }).fillna(0).astype(int)
+    penetration['Penetration %'] = penetration['Schools Reached'] / penetration['Total Schools'] * 100
+    penetration.index.name = 'Region'
+    return penetration.sort_values('Penetration %', ascending=False)
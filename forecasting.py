@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+
+# --------------------------
+# Batched Seasonal Forecasts
+# --------------------------
+SERIES_KEYS = ['Region', 'Item Type']
+UNASSIGNED = 'Unassigned'
+Z_95 = 1.96
+
+
+def monthly_panel(edu_df, value_col='Item Total'):
+    """Monthly revenue as a (month x series) matrix, one column per Region x Item Type.
+
+    Rows missing a Region or Item Type go to an UNASSIGNED series, so the columns
+    sum to total monthly revenue.
+    """
+    dated = edu_df.dropna(subset=['Order Date'])
+    if dated.empty:
+        return pd.DataFrame()
+    month = dated['Order Date'].dt.to_period('M').dt.to_timestamp()
+    keys = [dated[k].fillna(UNASSIGNED) for k in SERIES_KEYS]
+    panel = dated.groupby([month] + keys)[value_col].sum().unstack(SERIES_KEYS)
+    months = pd.date_range(panel.index.min(), panel.index.max(), freq='MS')
+    return panel.reindex(months).fillna(0.0)
+
+
+def _design(t, harmonics):
+    """Trend plus Fourier seasonal terms (12-month period) for time steps t."""
+    columns = [np.ones_like(t), t]
+    for k in range(1, harmonics + 1):
+        angle = 2 * np.pi * k * t / 12
+        columns += [np.sin(angle), np.cos(angle)]
+    return np.column_stack(columns)
+
+
+def fit_forecasts(panel, horizon=6):
+    """Fit trend + seasonal regressions to every panel column in one least-squares solve.
+
+    All series share the same monthly design matrix, so they are fitted as a single
+    batched problem instead of one model per series. Returns a long DataFrame with
+    Region, Item Type, Month, Forecast, Lower and Upper (95% band) columns.
+    """
+    if panel.empty or len(panel) < 3:
+        return pd.DataFrame(columns=SERIES_KEYS + ['Month', 'Forecast', 'Lower', 'Upper'])
+
+    n_obs = len(panel)
+    # Keep at least a few residual degrees of freedom on short histories
+    harmonics = int(min(3, max(0, (n_obs - 4) // 2)))
+    t = np.arange(n_obs, dtype=float)
+    X = _design(t, harmonics)
+    Y = panel.to_numpy(dtype=float)
+
+    coef, _, _, _ = np.linalg.lstsq(X, Y, rcond=None)
+    residuals = Y - X @ coef
+    dof = max(n_obs - X.shape[1], 1)
+    sigma = np.sqrt((residuals ** 2).sum(axis=0) / dof)
+
+    future_t = np.arange(n_obs, n_obs + horizon, dtype=float)
+    forecast = _design(future_t, harmonics) @ coef
+    future_months = pd.date_range(panel.index[-1], periods=horizon + 1, freq='MS')[1:]
+
+    series = panel.columns.to_frame(index=False)
+    result = pd.DataFrame({
+        'Month': np.repeat(future_months, Y.shape[1]),
+        'Forecast': forecast.ravel(),
+        'Sigma': np.tile(sigma, horizon),
+    })
+    result = pd.concat([pd.concat([series] * horizon, ignore_index=True), result], axis=1)
+    result['Forecast'] = result['Forecast'].clip(lower=0)
+    result['Lower'] = (result['Forecast'] - Z_95 * result['Sigma']).clip(lower=0)
+    result['Upper'] = result['Forecast'] + Z_95 * result['Sigma']
+    return result.drop(columns='Sigma')
+
+
+def total_forecast(forecasts):
+    """Sum per-series forecasts by month; bands combine assuming independent errors."""
+    if forecasts.empty:
+        return pd.DataFrame(columns=['Forecast', 'Lower', 'Upper'])
+    sigma = (forecasts['Upper'] - forecasts['Forecast']) / Z_95
+    grouped = forecasts.assign(Variance=sigma ** 2).groupby('Month')
+    total = grouped['Forecast'].sum().to_frame()
+    spread = Z_95 * np.sqrt(grouped['Variance'].sum())
+    total['Lower'] = (total['Forecast'] - spread).clip(lower=0)
+    total['Upper'] = total['Forecast'] + spread
+    return total
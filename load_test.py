@@ -0,0 +1,216 @@
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+# --------------------------
+# Dashboard load test
+# --------------------------
+# Runs many simulated viewer sessions against a dashboard script in one process
+# (sharing st.cache_data like a real server) and replays sidebar filter and
+# date-range changes. SharePoint is replaced by a generated local workbook.
+# A warm-up session fills imports and shared caches before anything is measured.
+# Example:
+#   python load_test.py --sessions 20 --interactions 10 --rows 50000
+REGIONS = ["London", "South East", "North West", "West Midlands", "East Of England",
+           "Yorkshire And The Humber", "South West", "East Midlands", "North East", "Scotland"]
+SCHOOL_TYPES = ["Academy", "Primary", "Secondary", "Special", "Independent", "Further Education"]
+ITEM_TYPES = ["iPad", "MacBook", "iMac", "iPhone", "Accessory", "Chromebook"]
+FILTER_LABELS = ("Select Region", "Select School Type", "Academic Period")
+DATE_SLIDER_LABEL = "Order Date Range"
+
+
+def write_mock_workbook(path, rows, n_schools=2000, seed=0):
+    """Write a synthetic Sales/Schools workbook shaped like the SharePoint export."""
+    rng = np.random.default_rng(seed)
+    schools = pd.DataFrame({
+        'School Name': [f"School {i:05d}" for i in range(n_schools)],
+        'Region': rng.choice(REGIONS, n_schools),
+        'School Type': rng.choice(SCHOOL_TYPES, n_schools),
+        'Number of Pupils': rng.integers(50, 2000, n_schools),
+    })
+
+    school_idx = rng.integers(0, n_schools, rows)
+    matched = rng.random(rows) < 0.6
+    dates = pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 3 * 365, rows), unit='D')
+    quantity = rng.integers(1, 30, rows)
+    sales = pd.DataFrame({
+        'Order ID': rng.integers(100000, 100000 + rows // 2, rows),
+        'Order Date': dates.strftime("%d/%m/%Y"),
+        'Customer Name': schools['School Name'].to_numpy()[school_idx],
+        'School Match': np.where(matched, schools['School Name'].to_numpy()[school_idx], "No Match"),
+        'Region': np.where(matched, schools['Region'].to_numpy()[school_idx], None),
+        'School Type': np.where(matched, schools['School Type'].to_numpy()[school_idx], None),
+        'Item Type': rng.choice(ITEM_TYPES, rows),
+        'Quantity': quantity,
+        'Item Total': np.round(quantity * rng.uniform(80, 900, rows), 2),
+    })
+
+    with pd.ExcelWriter(path) as writer:
+        sales.to_excel(writer, sheet_name="Sales", index=False)
+        schools.to_excel(writer, sheet_name="Schools", index=False)
+
+
+def _widget(widgets, label):
+    return next((w for w in widgets if w.label == label), None)
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _rss_mib():
+    """Current resident set size in MiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return _peak_rss_mib()
+
+
+def _peak_rss_mib():
+    scale = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _slider_date(microseconds):
+    # AppTest reports date slider bounds as epoch microseconds (UTC)
+    return datetime.fromtimestamp(microseconds / 1e6, tz=timezone.utc).date()
+
+
+def _move_date_slider(slider, rng):
+    first, last = _slider_date(slider.min), _slider_date(slider.max)
+    start, end = sorted(rng.randint(0, (last - first).days) for _ in range(2))
+    return slider.set_range(first + timedelta(days=start), first + timedelta(days=end))
+
+
+def run_session(script, interactions, timeout, seed, results):
+    """One simulated viewer: initial load, then random sidebar interactions."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    latencies = []
+    errors = 0
+    crashed = False
+
+    try:
+        at = AppTest.from_file(script, default_timeout=timeout)
+
+        def rerun(action):
+            nonlocal errors
+            start = time.perf_counter()
+            action()
+            latencies.append(time.perf_counter() - start)
+            errors += len(at.exception)
+
+        rerun(at.run)
+        for _ in range(interactions):
+            choices = [w for w in (_widget(at.selectbox, label) for label in FILTER_LABELS) if w is not None]
+            slider = _widget(at.slider, DATE_SLIDER_LABEL)
+            if slider is not None:
+                choices.append(slider)
+            if not choices:
+                rerun(at.run)
+                continue
+            widget = rng.choice(choices)
+            if widget is slider:
+                rerun(lambda: _move_date_slider(slider, rng).run())
+            else:
+                rerun(lambda: widget.select(rng.choice(widget.options)).run())
+    except Exception as exc:
+        # A crashed session counts as an error rather than silently disappearing
+        errors += 1
+        crashed = True
+        print(f"Session {seed} crashed: {exc!r}", file=sys.stderr)
+
+    results.append({'latencies': latencies, 'errors': errors, 'crashed': crashed})
+
+
+def sample_session(script, interactions, timeout, seed, results):
+    """Run one session on its own and return its (CPU seconds, retained RSS MiB)."""
+    cpu_before, rss_before = _cpu_seconds(), _rss_mib()
+    run_session(script, interactions, timeout, seed, results)
+    return _cpu_seconds() - cpu_before, _rss_mib() - rss_before
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the Streamlit dashboards.")
+    parser.add_argument("--script", default="my_dashboard .py", help="dashboard script to load")
+    parser.add_argument("--sessions", type=int, default=10, help="number of concurrent sessions")
+    parser.add_argument("--interactions", type=int, default=10, help="filter changes per session")
+    parser.add_argument("--rows", type=int, default=20000, help="rows in the mock Sales sheet")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per rerun")
+    parser.add_argument("--samples", type=int, default=3, help="sessions run alone afterwards to sample per-session cost")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workbook = os.path.join(tmp, "mock_sales.xlsx")
+        write_mock_workbook(workbook, args.rows, seed=args.seed)
+        os.environ["IOUTLET_SALES_SOURCE"] = workbook
+
+        # Imports, workbook load and shared caches are one-off costs of the server,
+        # not of a session, so they are paid before the baseline is taken
+        warmup_start = time.perf_counter()
+        run_session(args.script, 0, args.timeout, args.seed, [])
+        warmup = time.perf_counter() - warmup_start
+
+        cpu_before, rss_before = _cpu_seconds(), _rss_mib()
+        wall_start = time.perf_counter()
+        results = []
+        threads = [
+            threading.Thread(target=run_session,
+                             args=(args.script, args.interactions, args.timeout, args.seed + i + 1, results))
+            for i in range(args.sessions)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - wall_start
+        cpu = _cpu_seconds() - cpu_before
+        rss_growth = _rss_mib() - rss_before
+
+        sample_results = []
+        samples = np.array([
+            sample_session(args.script, args.interactions, args.timeout, args.seed + args.sessions + i + 1, sample_results)
+            for i in range(args.samples)
+        ]).reshape(-1, 2)
+
+    completed = sum(not r['crashed'] for r in results)
+    errors = sum(r['errors'] for r in results + sample_results)
+    latencies = np.array([t for r in results for t in r['latencies']]) * 1000
+    if latencies.size == 0:
+        print("No reruns completed.")
+        return 1
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+
+    print(f"Script:              {args.script}")
+    print(f"Sessions:            {args.sessions} x {args.interactions + 1} reruns ({completed} completed)")
+    print(f"Mock sales rows:     {args.rows:,}")
+    print(f"Warm-up:             {warmup:.1f}s (imports, data load, shared caches; excluded below)")
+    print(f"Wall time:           {wall:.1f}s")
+    print(f"Rerun latency:       p50 {p50:.0f} ms | p95 {p95:.0f} ms | p99 {p99:.0f} ms | max {latencies.max():.0f} ms")
+    print(f"Concurrent run:      {cpu:.1f}s CPU, {rss_growth:+.1f} MiB RSS "
+          f"({cpu / args.sessions:.2f}s, {rss_growth / args.sessions:+.1f} MiB per session)")
+    if len(samples):
+        print(f"Sampled per session: {np.median(samples[:, 0]):.2f}s CPU, {np.median(samples[:, 1]):+.1f} MiB RSS "
+              f"(median of {len(samples)} sessions run alone)")
+    print(f"Peak RSS:            {_peak_rss_mib():.0f} MiB")
+    print(f"Errors:              {errors} (script exceptions and crashed sessions, samples included)")
+    print("Not replayed:        download button clicks (AppTest cannot click them); the filtered CSV "
+          "payload is still rebuilt and measured on every rerun")
+    return 0 if completed == args.sessions and not any(r['crashed'] for r in sample_results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
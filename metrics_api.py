@@ -0,0 +1,151 @@
+import hashlib
+import json
+import threading
+import time
+
+import dash
+from dash import html
+from flask import Response, request
+
+from sales_data import (
+    load_workbook, data_version, date_slice, parse_date,
+    education_sales, sales_kpis, region_revenue, top_schools_by_revenue,
+)
+from enrichment import enrich_sales
+
+# --------------------------
+# Read-only JSON metrics API
+# --------------------------
+# Serves the same aggregates as the Streamlit dashboards for other internal
+# systems (CRM, stock planning). Run with: python metrics_api.py
+DATA_TTL_SECONDS = 300
+CACHE_CONTROL = f"public, max-age={DATA_TTL_SECONDS // 5}"
+RESPONSE_CACHE_SIZE = 256
+TOP_SCHOOLS_MAX = 100
+
+app = dash.Dash(__name__, title="iOutlet Metrics API")
+server = app.server
+
+_lock = threading.Lock()
+_reload_lock = threading.Lock()
+# (loaded_at, sales_df, version), replaced as a whole so readers never see a mix
+_state = {'data': None}
+_responses = {}
+
+
+def _fresh(snapshot):
+    return snapshot is not None and time.monotonic() - snapshot[0] <= DATA_TTL_SECONDS
+
+
+def current_data():
+    """Sales table and its data version, reloaded at most every DATA_TTL_SECONDS.
+
+    The download runs outside _lock and only one thread reloads at a time; the
+    others keep answering from the previous data until the new state is swapped in.
+    """
+    snapshot = _state['data']
+    if _fresh(snapshot):
+        return snapshot[1], snapshot[2]
+    if not _reload_lock.acquire(blocking=snapshot is None):
+        return snapshot[1], snapshot[2]
+    try:
+        snapshot = _state['data']
+        if not _fresh(snapshot):
+            sales_df, schools_df = load_workbook()
+            sales_df = enrich_sales(sales_df, schools_df)
+            version = data_version(sales_df)
+            with _lock:
+                if snapshot is None or version != snapshot[2]:
+                    _responses.clear()
+                snapshot = (time.monotonic(), sales_df, version)
+                _state['data'] = snapshot
+    finally:
+        _reload_lock.release()
+    return snapshot[1], snapshot[2]
+
+
+def _kpis(sales_df, params):
+    return sales_kpis(sales_df, education_sales(sales_df))
+
+
+def _regions(sales_df, params):
+    revenue = region_revenue(education_sales(sales_df))
+    return [{'region': region, 'revenue': float(total)} for region, total in revenue.items()]
+
+
+def _top_schools(sales_df, params):
+    schools = top_schools_by_revenue(education_sales(sales_df), params['n'])
+    return [{'school': school, 'revenue': float(total)} for school, total in schools.items()]
+
+
+ENDPOINTS = {
+    'kpis': _kpis,
+    'regions': _regions,
+    'top-schools': _top_schools,
+}
+
+
+def _json_response(body, etag, status=200):
+    response = Response(body if status == 200 else b"", status=status, mimetype="application/json")
+    response.headers['ETag'] = f'"{etag}"'
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def _request_params(name):
+    """Normalised query parameters; unknown parameters are ignored."""
+    start = request.args.get('start')
+    end = request.args.get('end')
+    params = {
+        'start': None if start is None else parse_date(start).date().isoformat(),
+        'end': None if end is None else parse_date(end).date().isoformat(),
+    }
+    if name == 'top-schools':
+        n = request.args.get('n', default=10, type=int)
+        params['n'] = max(1, min(n, TOP_SCHOOLS_MAX))
+    return params
+
+
+def _error(message, status):
+    return Response(json.dumps({'error': message}), status=status, mimetype="application/json")
+
+
+@server.route("/api/<name>")
+def metrics(name):
+    if name not in ENDPOINTS:
+        return _error(f"unknown endpoint '{name}'", 404)
+    try:
+        params = _request_params(name)
+    except ValueError:
+        return _error("start/end must be dates (YYYY-MM-DD)", 400)
+
+    sales_df, version = current_data()
+    key = (name,) + tuple(sorted(params.items()))
+    # The ETag only depends on the data version and the normalised request, so a
+    # client that already holds it is answered before anything is computed
+    etag = f"{version}-{hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:8]}"
+    if etag in request.if_none_match:
+        return _json_response(None, etag, status=304)
+
+    with _lock:
+        cached = _responses.get(key)
+    if cached is None or cached[0] != version:
+        data = ENDPOINTS[name](date_slice(sales_df, params['start'], params['end']), params)
+        body = json.dumps({'version': version, **params, 'data': data}).encode('utf-8')
+        cached = (version, body)
+        with _lock:
+            _responses[key] = cached
+            # Oldest entries go first once the cache is full
+            while len(_responses) > RESPONSE_CACHE_SIZE:
+                del _responses[next(iter(_responses))]
+    return _json_response(cached[1], etag)
+
+
+app.layout = html.Div([
+    html.H1("iOutlet Metrics API"),
+    html.P("Read-only JSON endpoints. Optional start/end query parameters (YYYY-MM-DD) limit the order date range."),
+    html.Ul([html.Li(html.Code(f"/api/{name}")) for name in ENDPOINTS]),
+])
+
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=8050)
@@ -1,9 +1,15 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-import requests
-import io
 import seaborn as sns
+from sales_data import (
+    load_workbook, date_bounds, date_slice, academic_periods, data_version,
+    education_sales, sales_kpis, region_revenue, top_schools_by_revenue,
+)
+from forecasting import monthly_panel, fit_forecasts, total_forecast
+from enrichment import enrich_sales
+from anomalies import new_anomaly_state, update_anomalies
+from cohorts import cohort_matrices
 
 # --------------------------
 # Responsive CSS for better display on all devices
@@ -54,36 +60,68 @@ To develop a data-driven strategy for expanding refurbished tech sales in the ed
 # --------------------------
 # Load and Clean Data from SharePoint
 # --------------------------
-@st.cache_data
+@st.cache_resource
+def anomaly_state():
+    return new_anomaly_state()
+
+# Reload hourly; anomaly detection only scores rows that are new since the last load
+@st.cache_data(ttl=3600)
 def load_data():
-    file_url = "https://dmail-my.sharepoint.com/:x:/g/personal/2619506_dundee_ac_uk/ETLrFWlAs81NpHPN3_nhayEBVPVFauwk8jQCcwEt-cuv4Q?download=1"
-    response = requests.get(file_url)
-    bytes_io = io.BytesIO(response.content)
-    sales_df = pd.read_excel(bytes_io, sheet_name="Sales")
-    schools_df = pd.read_excel(bytes_io, sheet_name="Schools")
-    sales_df.columns = sales_df.columns.str.strip()
-    sales_df['Order Date'] = pd.to_datetime(sales_df['Order Date'], errors='coerce', dayfirst=True)
-    return sales_df, schools_df
+    # Sales come back sorted on Order Date so date ranges resolve to contiguous slices
+    sales_df, schools_df = load_workbook()
+    # Region, School Type and pupil counts come from the Schools reference sheet
+    sales_df = enrich_sales(sales_df, schools_df)
+    update_anomalies(anomaly_state(), education_sales(sales_df))
+    # Hashed once per load; keys every derived cache below
+    return sales_df, schools_df, data_version(sales_df)
+
+sales_df, schools_df, version = load_data()
+# Full history, before any date-range slicing
+full_edu_df = education_sales(sales_df)
 
-sales_df, schools_df = load_data()
-edu_df = sales_df[sales_df['School Match'].str.lower() != "no match"]
+# --------------------------
+# Date Range Filter
+# --------------------------
+first_date, last_date = date_bounds(sales_df)
+if first_date is not None:
+    st.sidebar.markdown("## 📅 Date Range")
+    periods = academic_periods(first_date, last_date)
+    period = st.sidebar.selectbox("Academic Period", options=['All Dates'] + list(periods))
+    period_start, period_end = periods.get(period, (first_date, last_date))
+    period_start = max(period_start, first_date).date()
+    period_end = min(period_end, last_date).date()
+    start_date, end_date = st.sidebar.slider(
+        "Order Date Range",
+        min_value=first_date.date(),
+        max_value=last_date.date(),
+        value=(period_start, period_end),
+        format="DD/MM/YYYY",
+    )
+    if (start_date, end_date) != (first_date.date(), last_date.date()):
+        sales_df = date_slice(sales_df, start_date, end_date)
+
+edu_df = education_sales(sales_df)
+
+# Outliers and spikes inside the selected date range
+anomalies = anomaly_state()
+range_start, range_end = date_bounds(sales_df)
+outlier_orders = anomalies['outliers'].drop(columns='_hash')
+spikes = anomalies['spikes']
+if range_start is not None:
+    outlier_orders = outlier_orders[outlier_orders['Order Date'].between(range_start, range_end)]
+    spikes = spikes[spikes['Month'].between(range_start.to_period('M').to_timestamp(), range_end)]
 
 # --------------------------
 # KPIs
 # --------------------------
-total_revenue = sales_df['Item Total'].sum()
-edu_revenue = edu_df['Item Total'].sum()
-total_units = sales_df['Quantity'].sum()
-schools_reached = edu_df['School Match'].nunique()
-repeat_orders = edu_df.groupby('School Match')['Order ID'].nunique()
-repeat_order_rate = (repeat_orders[repeat_orders > 1].count() / schools_reached) * 100
+kpis = sales_kpis(sales_df, edu_df)
 
 col1, col2, col3, col4, col5 = st.columns(5)
-col1.metric("💰 Total Revenue", f"£{total_revenue:,.2f}")
-col2.metric("🎓 Education Revenue", f"£{edu_revenue:,.2f}")
-col3.metric("📦 Units Sold", f"{int(total_units):,}")
-col4.metric("🏫 Schools Reached", f"{schools_reached}")
-col5.metric("⚖️ Repeat Orders %", f"{repeat_order_rate:.1f}%")
+col1.metric("💰 Total Revenue", f"£{kpis['total_revenue']:,.2f}")
+col2.metric("🎓 Education Revenue", f"£{kpis['edu_revenue']:,.2f}")
+col3.metric("📦 Units Sold", f"{kpis['total_units']:,}")
+col4.metric("🏫 Schools Reached", f"{kpis['schools_reached']}")
+col5.metric("⚖️ Repeat Orders %", f"{kpis['repeat_order_rate']:.1f}%")
 
 # --------------------------
 # Monthly Sales Trends
@@ -92,18 +130,62 @@ st.markdown("### 📈 Monthly Sales Trends")
 monthly_sales = sales_df.resample('MS', on='Order Date')['Item Total'].sum()
 monthly_edu = edu_df.resample('MS', on='Order Date')['Item Total'].sum()
 
-fig1, ax1 = plt.subplots(figsize=(8, 4))
-ax1.plot(monthly_sales.index, monthly_sales.values, label='All Sales', marker='o')
-ax1.plot(monthly_edu.index, monthly_edu.values, label='Education Sales', marker='s')
-ax1.set_title("Monthly Revenue")
-ax1.set_ylabel("£")
-ax1.legend()
-ax1.grid(True)
-st.pyplot(fig1)
-st.markdown("""
+colF1, colF2 = st.columns(2)
+with colF1:
+    fig1, ax1 = plt.subplots(figsize=(8, 4))
+    ax1.plot(monthly_sales.index, monthly_sales.values, label='All Sales', marker='o')
+    ax1.plot(monthly_edu.index, monthly_edu.values, label='Education Sales', marker='s')
+    edu_spikes = spikes[spikes['Series'] == 'All Education']
+    if not edu_spikes.empty:
+        ax1.scatter(edu_spikes['Month'], edu_spikes['Revenue'], color='red', marker='X', s=80, zorder=3, label='Spike')
+    ax1.set_title("Monthly Revenue")
+    ax1.set_ylabel("£")
+    ax1.legend()
+    ax1.grid(True)
+    st.pyplot(fig1)
+    st.markdown("""
 This line chart shows the total revenue over time, comparing all sales with those specifically from the education sector.  
 You can see seasonal peaks and overall growth, helping identify periods of higher demand and sales trends.
 """)
+
+# Forecasts are fitted for every Region x Item Type in one batch, on the full
+# history so the horizon starts after the latest data, and cached per data version
+# (only the last few versions are kept, so hourly reloads don't pile up)
+@st.cache_data(show_spinner="Fitting seasonal forecasts...", max_entries=3)
+def load_forecasts(version, _edu_df, horizon=6):
+    panel = monthly_panel(_edu_df)
+    return panel, fit_forecasts(panel, horizon)
+
+forecast_panel, forecasts = load_forecasts(version, full_edu_df)
+
+with colF2:
+    forecast_series = ['All Education'] + [
+        f"{region} · {item}" for region, item in forecasts[['Region', 'Item Type']].drop_duplicates().itertuples(index=False)
+    ]
+    selected_series = st.selectbox("Forecast Series (Region · Item Type)", options=forecast_series)
+    # History comes from the same panel the models were fitted on
+    if selected_series == 'All Education':
+        history = forecast_panel.sum(axis=1)
+        forecast = total_forecast(forecasts)
+    else:
+        region, item = selected_series.split(" · ", 1)
+        history = forecast_panel[(region, item)]
+        forecast = forecasts[(forecasts['Region'] == region) & (forecasts['Item Type'] == item)].set_index('Month')
+
+    fig1f, ax1f = plt.subplots(figsize=(8, 4))
+    ax1f.plot(history.index, history.values, label='Actual', marker='s')
+    if not forecast.empty:
+        ax1f.plot(forecast.index, forecast['Forecast'], label='Forecast', linestyle='--', marker='o')
+        ax1f.fill_between(forecast.index, forecast['Lower'], forecast['Upper'], alpha=0.2, label='95% Band')
+    ax1f.set_title("Education Revenue Forecast")
+    ax1f.set_ylabel("£")
+    ax1f.legend()
+    ax1f.grid(True)
+    st.pyplot(fig1f)
+    st.markdown("""
+This chart projects education revenue for the next six months using a seasonal trend model fitted to each region and item type.  
+The shaded band shows the expected range, supporting inventory planning around procurement seasonality.
+""")
 # --------------------------
 # School Segmentation
 # --------------------------
@@ -150,11 +232,8 @@ It highlights lucrative areas and sales distribution, helping focus marketing an
 # Clean and normalize the 'Region' column
 edu_df['Region'] = edu_df['Region'].astype(str).str.strip().str.title()
 
-# Filter out invalid or missing regions
-valid_regions_df = edu_df[(edu_df['Region'] != '') & (edu_df['Region'].str.lower() != 'nan')]
-
-# Aggregate revenue by region
-region_sales = valid_regions_df.groupby('Region')['Item Total'].sum().sort_values(ascending=False)
+# Aggregate revenue by region, skipping invalid or missing regions
+region_sales = region_revenue(edu_df)
 
 # Plotting with Seaborn for a nicer style
 import matplotlib.ticker as ticker
@@ -184,9 +263,70 @@ st.markdown("""
 The table lists the top ten schools by total revenue from purchases.  
 This helps identify key accounts for relationship building and tailored offers.
 """)
-top_schools = edu_df.groupby('School Match')['Item Total'].sum().sort_values(ascending=False).head(10)
+top_schools = top_schools_by_revenue(edu_df)
 st.dataframe(top_schools, use_container_width=True)
 
+# --------------------------
+# Outlier Orders & Monthly Spikes
+# --------------------------
+st.markdown("### ⚠️ Outlier Orders & Monthly Spikes")
+st.markdown("""
+Order lines far above the recent history of their school or item type, and months whose revenue jumps well above the previous six months.  
+Check these before reading the trend chart and top-10 tables: they are usually bulk orders or data-entry errors.
+""")
+colO1, colO2 = st.columns([3, 2])
+with colO1:
+    st.markdown(f"**Outlier order lines:** {len(outlier_orders)}")
+    st.dataframe(
+        outlier_orders.sort_values('Order Date', ascending=False).style.format(
+            {'Item Total': '£{:,.2f}', 'School Score': '{:.1f}', 'Item Score': '{:.1f}'}, na_rep='-'),
+        use_container_width=True,
+    )
+with colO2:
+    st.markdown(f"**Monthly spikes:** {len(spikes)}")
+    st.dataframe(
+        spikes.sort_values('Month', ascending=False).style.format(
+            {'Month': lambda m: m.strftime('%b %Y'), 'Revenue': '£{:,.2f}', 'Score': '{:.1f}'}),
+        use_container_width=True,
+    )
+
+# --------------------------
+# Cohort Retention
+# --------------------------
+st.markdown("### 🔁 School Cohort Retention")
+st.markdown("""
+Schools are grouped by the month of their first order. Each cell shows how that cohort behaved a number of months later:
+the share of schools ordering again (repeat purchase) or revenue relative to the cohort's first month (revenue retention).  
+This shows whether new school customers come back, and how quickly.
+""")
+
+# Cohorts need each school's true first order, so they are built on the full
+# history once per data version; the date range only selects which cohorts to show
+@st.cache_data(show_spinner="Building cohort matrix...", max_entries=3)
+def load_cohorts(version, _edu_df):
+    return cohort_matrices(_edu_df)
+
+cohorts = load_cohorts(version, full_edu_df)
+cohort_sizes = cohorts['size']
+if range_start is not None and not cohort_sizes.empty:
+    cohort_sizes = cohort_sizes[cohort_sizes.index.to_series().between(range_start.to_period('M').to_timestamp(), range_end)]
+
+if cohort_sizes.empty:
+    st.info("No school cohorts started in the selected range.")
+else:
+    retention_view = st.radio("Retention Measure", ["Repeat Purchase %", "Revenue Retention %"], horizontal=True)
+    retention = cohorts['schools'] if retention_view == "Repeat Purchase %" else cohorts['revenue']
+    retention = retention.loc[cohort_sizes.index].iloc[:, :13]
+    retention.index = [f"{month:%b %Y} ({size})" for month, size in cohort_sizes.items()]
+
+    fig_c, ax_c = plt.subplots(figsize=(12, max(4, 0.35 * len(retention))))
+    sns.heatmap(retention, annot=True, fmt='.0f', cmap='YlGnBu', vmin=0, vmax=100 if retention_view == "Repeat Purchase %" else None,
+                cbar_kws={'label': '%'}, ax=ax_c)
+    ax_c.set_xlabel("Months Since First Order")
+    ax_c.set_ylabel("First Order Month (schools)")
+    ax_c.set_title(retention_view.replace(" %", "") + " by Cohort")
+    st.pyplot(fig_c)
+
 # --------------------------
 # Product Insights
 # --------------------------
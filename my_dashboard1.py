@@ -2,6 +2,9 @@ import dash
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import matplotlib.pyplot as plt
+from sales_data import data_version
+from enrichment import build_school_index, enrich_sales, market_penetration, schools_per_region
 
 
 st.set_page_config(page_title="iOutlet Education Sales Dashboard", layout="wide")
@@ -14,9 +17,14 @@ def load_data():
     schools_df = pd.read_excel(file_path, sheet_name="Schools")
     sales_df.columns = sales_df.columns.str.strip()
     sales_df['Order Date'] = pd.to_datetime(sales_df['Order Date'], dayfirst=True, errors='coerce')
-    return sales_df, schools_df
+    # Fill Region, School Type and pupil counts from the Schools reference sheet;
+    # the hashed school index is built once here and reused below
+    school_index = build_school_index(schools_df)
+    sales_df = enrich_sales(sales_df, schools_df, school_index)
+    versions = (data_version(sales_df), data_version(schools_df))
+    return sales_df, schools_df, school_index, versions
 
-sales_df, schools_df = load_data()
+sales_df, schools_df, school_index, versions = load_data()
 
 # FILTER: Education Sector
 edu_df = sales_df[sales_df['School Match'].str.lower() != "no match"]
@@ -89,13 +97,32 @@ st.pyplot(fig5)
 
 # Schools by Region
 st.markdown("### 📚 Schools by Region")
-region_counts = schools_df['Region'].astype(str).str.strip().value_counts()
-
-fig6, ax6 = plt.subplots()
-region_counts.plot(kind='barh', color='purple', ax=ax6)
-ax6.set_xlabel("Number of Schools")
-ax6.set_title("Number of Schools per Region")
-st.pyplot(fig6)
+region_counts = schools_per_region(schools_df, school_index)
+
+if not region_counts.empty:
+    fig6, ax6 = plt.subplots()
+    region_counts.plot(kind='barh', color='purple', ax=ax6)
+    ax6.set_xlabel("Number of Schools")
+    ax6.set_title("Number of Schools per Region")
+    st.pyplot(fig6)
+
+# Market Penetration
+st.markdown("### 🎯 Market Penetration by Region")
+
+# Keyed on both the sales and the Schools sheet versions; old versions are evicted
+@st.cache_data(max_entries=3)
+def load_penetration(versions, _edu_df, _schools_df, _school_index):
+    return market_penetration(_edu_df, _schools_df, _school_index)
+
+penetration = load_penetration(versions, edu_df, schools_df, school_index)
+
+if not penetration.empty:
+    fig7, ax7 = plt.subplots()
+    penetration['Penetration %'].sort_values().plot(kind='barh', color='darkorange', ax=ax7)
+    ax7.set_xlabel("Schools Reached (%)")
+    ax7.set_title("Schools Reached vs. Total Schools per Region")
+    st.pyplot(fig7)
+    st.dataframe(penetration.style.format({'Penetration %': '{:.1f}%'}))
 
 # Clustering Segments (Optional if you've run KMeans)
 st.markdown("### 🔍 Customer Segmentation (Cluster Summary)")
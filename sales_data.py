@@ -0,0 +1,253 @@
+import hashlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import requests
+
+SHAREPOINT_URL = "https://dmail-my.sharepoint.com/:x:/g/personal/2619506_dundee_ac_uk/ETLrFWlAs81NpHPN3_nhayEBVPVFauwk8jQCcwEt-cuv4Q?download=1"
+# Point the dashboards at another workbook (e.g. a local stand-in for load tests)
+SALES_SOURCE = os.environ.get("IOUTLET_SALES_SOURCE", SHAREPOINT_URL)
+
+
+# --------------------------
+# Load and Clean Data
+# --------------------------
+SALES_COLUMNS = ['Order ID', 'Order Date', 'Customer Name', 'School Match', 'Region',
+                 'School Type', 'Item Type', 'Quantity', 'Item Total']
+
+
+def _canonical_columns(sales_df):
+    """Map header variants (casing, underscores, prefixes) onto SALES_COLUMNS."""
+    lookup = {col.lower(): col for col in SALES_COLUMNS}
+    sales_df = sales_df.rename(columns=lambda col: lookup.get(str(col).strip().lower().replace("_", " "), col))
+    # Prefixed exports, e.g. "Lineitem Quantity"
+    for col in SALES_COLUMNS:
+        if col not in sales_df.columns:
+            match = next((c for c in sales_df.columns
+                          if col.lower() in str(c).lower().replace("_", " ") and c not in SALES_COLUMNS), None)
+            if match is not None:
+                sales_df = sales_df.rename(columns={match: col})
+    return sales_df
+
+
+def load_workbook(source=None):
+    """Read the Sales and Schools sheets from a URL or local path.
+
+    Defaults to SALES_SOURCE. Sales headers are mapped onto SALES_COLUMNS before
+    anything reads them, then rows are sorted on Order Date (see sort_by_order_date).
+    """
+    if source is None:
+        source = SALES_SOURCE
+    if str(source).startswith(("http://", "https://")):
+        response = requests.get(source)
+        response.raise_for_status()
+        source = io.BytesIO(response.content)
+    sales_df = pd.read_excel(source, sheet_name="Sales")
+    schools_df = pd.read_excel(source, sheet_name="Schools")
+    sales_df = _canonical_columns(sales_df)
+    sales_df['Order Date'] = pd.to_datetime(sales_df['Order Date'], errors='coerce', dayfirst=True)
+    return sort_by_order_date(sales_df), schools_df
+
+
+# --------------------------
+# Source Registry
+# --------------------------
+# Workbooks merged by load_sources, highest priority first
+DATA_SOURCES = [SALES_SOURCE]
+
+
+def register_source(source):
+    """Add a workbook (local path or URL) to the sources merged by load_sources."""
+    if source not in DATA_SOURCES:
+        DATA_SOURCES.append(source)
+
+
+def order_key(order_ids):
+    """Order ID as a comparable string: 1, 1.0 and " 1 " all give "1".
+
+    A blank ID makes pandas read the whole column as float, so integral numbers
+    are normalised before comparing across sources; other IDs are kept as text.
+    Missing IDs give NaN.
+    """
+    key = order_ids.astype(str).str.strip().astype(object)
+    numeric = pd.to_numeric(order_ids, errors='coerce')
+    integral = numeric.notna() & (numeric % 1 == 0)
+    key[integral] = numeric[integral].astype('int64').astype(str)
+    return key.where(order_ids.notna(), np.nan)
+
+
+LINE_KEY_COLUMNS = ['_order_key', '_item_key', '_quantity_key', '_total_key']
+
+
+def _line_key(sales_df):
+    """Order ID plus line content, normalised so sources compare equal."""
+    return pd.DataFrame({
+        '_order_key': order_key(sales_df['Order ID']),
+        '_item_key': sales_df['Item Type'].astype(str).str.strip().str.casefold().where(sales_df['Item Type'].notna()),
+        '_quantity_key': pd.to_numeric(sales_df['Quantity'], errors='coerce'),
+        '_total_key': pd.to_numeric(sales_df['Item Total'], errors='coerce').round(2),
+    }, index=sales_df.index)
+
+
+def load_sources(sources=None):
+    """Load each source once and merge them into one deduplicated dataset.
+
+    Sales lines are keyed by Order ID plus their content (Item Type, Quantity,
+    Item Total); when the same line appears in several sources the earliest
+    source wins. Identical lines repeated within one order are kept, and lines
+    without an Order ID are always kept.
+    """
+    sources = DATA_SOURCES if sources is None else sources
+    sales_frames = []
+    school_frames = []
+    for source in sources:
+        sales_df, schools_df = load_workbook(source)
+        sales_df[LINE_KEY_COLUMNS] = _line_key(sales_df)
+        # Numbers identical lines within one order, so genuine repeats are kept
+        sales_df['_repeat'] = sales_df.groupby(LINE_KEY_COLUMNS, sort=False, dropna=False).cumcount()
+        sales_frames.append(sales_df)
+        school_frames.append(schools_df)
+
+    sales_df = pd.concat(sales_frames, ignore_index=True)
+    duplicate = sales_df.duplicated(subset=LINE_KEY_COLUMNS + ['_repeat']) & sales_df['Order ID'].notna()
+    sales_df = sales_df[~duplicate].drop(columns=LINE_KEY_COLUMNS + ['_repeat'])
+    schools_df = pd.concat(school_frames, ignore_index=True).drop_duplicates(ignore_index=True)
+    return sort_by_order_date(sales_df), schools_df
+
+
+# --------------------------
+# Data Version
+# --------------------------
+def data_version(df):
+    """Short content hash of a table, used to key caches of derived results."""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()[:16]
+
+
+# --------------------------
+# Time Index
+# --------------------------
+def sort_by_order_date(sales_df):
+    """Return the sales table sorted on Order Date, undated rows last."""
+    return sales_df.sort_values('Order Date', kind='mergesort', na_position='last').reset_index(drop=True)
+
+
+def date_bounds(sorted_df):
+    """First and last order date of a table sorted with sort_by_order_date."""
+    dates = sorted_df['Order Date']
+    dated = dates.notna().sum()
+    if dated == 0:
+        return None, None
+    return dates.iloc[0], dates.iloc[dated - 1]
+
+
+def parse_date(value):
+    """Day-precision Timestamp for value; ValueError if it is not a date."""
+    timestamp = pd.Timestamp(value)
+    if pd.isna(timestamp):
+        raise ValueError(f"not a date: {value!r}")
+    return timestamp.normalize()
+
+
+def date_slice(sorted_df, start=None, end=None):
+    """Rows of a date-sorted table with start <= Order Date <= end (inclusive days).
+
+    Both bounds are resolved with binary search, so the result is a contiguous
+    slice of the table rather than a boolean mask over the full history. With no
+    bounds the whole table, including undated rows, is returned. Bounds that are
+    not dates (including empty strings) raise ValueError.
+    """
+    if start is None and end is None:
+        return sorted_df
+    start = None if start is None else parse_date(start)
+    end = None if end is None else parse_date(end)
+    dates = sorted_df['Order Date'].to_numpy(dtype='datetime64[ns]')
+    dates = dates[:np.count_nonzero(~np.isnat(dates))]
+    lo = 0
+    hi = len(dates)
+    if start is not None:
+        lo = np.searchsorted(dates, np.datetime64(start, 'ns'), side='left')
+    if end is not None:
+        hi = np.searchsorted(dates, np.datetime64(end + pd.Timedelta(days=1), 'ns'), side='left')
+    return sorted_df.iloc[lo:max(lo, hi)]
+
+
+# --------------------------
+# Academic Calendar Presets
+# --------------------------
+TERMS = [
+    ("Autumn", 9, 12),
+    ("Spring", 1, 3),
+    ("Summer", 4, 8),
+]
+
+
+def academic_periods(first, last):
+    """Academic years (Sep-Aug), terms and calendar quarters covering first..last.
+
+    Returns an ordered dict of label -> (start, end) timestamps, newest first.
+    """
+    periods = {}
+    if first is None or last is None:
+        return periods
+    first = pd.Timestamp(first)
+    last = pd.Timestamp(last)
+    first_year = first.year if first.month >= 9 else first.year - 1
+    last_year = last.year if last.month >= 9 else last.year - 1
+
+    years = {}
+    terms = {}
+    for year in range(last_year, first_year - 1, -1):
+        years[f"Academic Year {year}/{str(year + 1)[-2:]}"] = (
+            pd.Timestamp(year, 9, 1), pd.Timestamp(year + 1, 8, 31))
+        for name, start_month, end_month in reversed(TERMS):
+            term_year = year if start_month >= 9 else year + 1
+            start = pd.Timestamp(term_year, start_month, 1)
+            end = start + pd.offsets.MonthEnd(end_month - start_month + 1)
+            if end >= first and start <= last:
+                terms[f"{name} Term {year}/{str(year + 1)[-2:]}"] = (start, end)
+
+    quarters = {}
+    for quarter in pd.period_range(first, last, freq='Q')[::-1]:
+        quarters[f"Q{quarter.quarter} {quarter.year}"] = (quarter.start_time, quarter.end_time.normalize())
+
+    periods.update(years)
+    periods.update(terms)
+    periods.update(quarters)
+    return periods
+
+
+# --------------------------
+# Aggregates
+# --------------------------
+def education_sales(sales_df):
+    """Sales rows matched to a school."""
+    return sales_df[sales_df['School Match'].str.lower() != "no match"]
+
+
+def sales_kpis(sales_df, edu_df):
+    """Headline KPIs shown across the top of the dashboard."""
+    schools_reached = edu_df['School Match'].nunique()
+    repeat_orders = edu_df.groupby('School Match')['Order ID'].nunique()
+    repeat_order_rate = (repeat_orders[repeat_orders > 1].count() / schools_reached) * 100 if schools_reached else 0.0
+    return {
+        'total_revenue': float(sales_df['Item Total'].sum()),
+        'edu_revenue': float(edu_df['Item Total'].sum()),
+        'total_units': int(sales_df['Quantity'].sum()),
+        'schools_reached': int(schools_reached),
+        'repeat_order_rate': float(repeat_order_rate),
+    }
+
+
+def region_revenue(edu_df):
+    """Education revenue per (cleaned) region, highest first."""
+    region = edu_df['Region'].astype(str).str.strip().str.title()
+    valid = (region != '') & (region.str.lower() != 'nan')
+    return edu_df['Item Total'][valid].groupby(region[valid]).sum().sort_values(ascending=False)
+
+
+def top_schools_by_revenue(edu_df, n=10):
+    """The n schools with the highest total revenue."""
+    return edu_df.groupby('School Match')['Item Total'].sum().sort_values(ascending=False).head(n)
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from anomalies import new_anomaly_state, update_anomalies
+
+
+def _orders(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # Mostly single-unit lines, the usual shape of school orders
+    quantity = rng.choice([1, 2, 3], size=n, p=[0.8, 0.15, 0.05])
+    return pd.DataFrame({
+        'Order ID': np.arange(n),
+        'Order Date': pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(n) // 10, unit='D'),
+        'School Match': rng.choice([f"School {i}" for i in range(20)], size=n),
+        'Item Type': rng.choice(["iPad", "MacBook", "Charger"], size=n),
+        'Quantity': quantity,
+        'Item Total': quantity * 300.0,
+    })
+
+
+def test_small_quantities_on_flat_history_are_not_flagged():
+    state = update_anomalies(new_anomaly_state(), _orders(5000))
+
+    assert state['outliers'].empty
+
+
+def test_bulk_order_is_flagged_incrementally():
+    orders = _orders(5000)
+    state = update_anomalies(new_anomaly_state(), orders)
+
+    bulk = orders.tail(1).assign(**{'Order ID': 99999, 'Quantity': 60, 'Item Total': 18000.0})
+    state = update_anomalies(state, pd.concat([orders, bulk], ignore_index=True))
+
+    assert state['outliers']['Order ID'].tolist() == [99999]
+
+
+def test_corrected_row_leaves_no_stale_totals():
+    orders = _orders(500)
+    state = update_anomalies(new_anomaly_state(), orders)
+
+    corrected = orders.copy()
+    corrected.loc[0, 'Item Total'] += 1000.0
+    state = update_anomalies(state, corrected)
+
+    assert state['monthly']['All Education'].sum() == corrected['Item Total'].sum()
@@ -0,0 +1,65 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from sales_data import load_sources, load_workbook, order_key
+
+
+def _workbook(sales):
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer) as writer:
+        sales.to_excel(writer, sheet_name="Sales", index=False)
+        pd.DataFrame({'School Name': ["School A"]}).to_excel(writer, sheet_name="Schools", index=False)
+    buffer.seek(0)
+    return buffer
+
+
+def _sales(order_ids, item_types=None):
+    return pd.DataFrame({
+        'Order ID': order_ids,
+        'Order Date': ["01/09/2024"] * len(order_ids),
+        'School Match': ["School A"] * len(order_ids),
+        'Item Type': item_types or ["iPad"] * len(order_ids),
+        'Quantity': [1] * len(order_ids),
+        'Item Total': [100.0] * len(order_ids),
+    })
+
+
+def test_order_key_normalises_float_ids():
+    keys = order_key(pd.Series([1.0, 2.0, np.nan, 3.5]))
+    assert keys[[0, 1, 3]].tolist() == ["1", "2", "3.5"]
+    assert pd.isna(keys[2])
+    assert order_key(pd.Series([" 1", "A-7"])).tolist() == ["1", "A-7"]
+
+
+def test_load_sources_dedupes_int_and_float_order_ids():
+    int_source = _workbook(_sales([1001, 1002, 1003]))
+    # A blank Order ID makes the whole column float when read back
+    float_source = _workbook(_sales([1001.0, 1002.0, 1003.0, np.nan]))
+
+    sales_df, _ = load_sources([int_source, float_source])
+
+    assert len(sales_df) == 4
+    assert sales_df['Order ID'].notna().sum() == 3
+
+
+def test_load_sources_keeps_distinct_and_repeated_lines():
+    first = _workbook(_sales([1001, 1001], ["iPad", "Mac"]))
+    second = _workbook(_sales([1001, 1001], ["Mac", "Charger"]))
+    # The same line twice in one order is a genuine repeat, not a duplicate
+    repeats = _workbook(_sales([2001, 2001]))
+
+    sales_df, _ = load_sources([first, second, repeats])
+
+    assert sorted(sales_df.loc[sales_df['Order ID'] == 1001, 'Item Type']) == ["Charger", "Mac", "iPad"]
+    assert (sales_df['Order ID'] == 2001).sum() == 2
+
+
+def test_load_workbook_normalises_headers_before_parsing_dates():
+    sales = _sales([1001]).rename(columns={'Order Date': "order_date", 'Item Total': " item total "})
+
+    sales_df, _ = load_workbook(_workbook(sales))
+
+    assert sales_df.loc[0, 'Order Date'] == pd.Timestamp(2024, 9, 1)
+    assert sales_df.loc[0, 'Item Total'] == 100.0